@@ -0,0 +1,114 @@
+import numpy as np
+
+
+def _get_numba_kernels(use_numba: bool):
+    if not use_numba:
+        return None
+    try:
+        from . import _numba_kernels
+    except ImportError:
+        return None
+    return _numba_kernels
+
+
+def _m4_downsample_numpy(x: np.ndarray, y: np.ndarray, width: int):
+    edges = np.linspace(x[0], x[-1], width + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side='left'))
+    ends = np.append(starts[1:], len(x))
+    bucket_ids = np.repeat(np.arange(len(starts)), ends - starts)
+    indices = np.arange(len(x))
+    # NaNs are ignored, unless a bucket holds nothing else. Then every point in the
+    # bucket matches and its first point is kept
+    min_y = np.fmin.reduceat(y, starts)[bucket_ids]
+    max_y = np.fmax.reduceat(y, starts)[bucket_ids]
+    min_indices = np.minimum.reduceat(
+        np.where((y == min_y) | np.isnan(min_y), indices, len(x)), starts
+    )
+    max_indices = np.minimum.reduceat(
+        np.where((y == max_y) | np.isnan(max_y), indices, len(x)), starts
+    )
+    kept = np.unique(np.column_stack([starts, min_indices, max_indices, ends - 1]))
+    return x[kept], y[kept]
+
+
+def _hist_uniform_stacked_numpy(
+    x: np.ndarray, lengths: np.ndarray, bin_edges: np.ndarray
+):
+    nbins = len(bin_edges) - 1
+    lo, hi = bin_edges[0], bin_edges[-1]
+    series_ids = np.repeat(np.arange(len(lengths)), lengths)
+    bin_indices = np.clip(
+        ((x - lo) / (hi - lo) * nbins).astype(np.intp), 0, nbins - 1
+    )
+    # As in np.histogram, values that rounding put on the wrong side of an edge
+    # are moved into the bin given by the edges themselves
+    bin_indices[x < bin_edges[bin_indices]] -= 1
+    bin_indices[(x >= bin_edges[bin_indices + 1]) & (bin_indices != nbins - 1)] += 1
+    counts = np.bincount(
+        series_ids * nbins + bin_indices, minlength=len(lengths) * nbins
+    )
+    return counts.reshape(len(lengths), nbins)
+
+
+def m4_downsample(
+    x: np.ndarray, y: np.ndarray, width: int, use_numba: bool = False
+):
+    """
+    Downsamples a line using M4 aggregation. The x range is split into `width`
+    equal buckets (one per pixel) and only the first, last, minimum and maximum
+    points of each bucket are kept, which renders identically to the full line at
+    that width. NaN values are ignored when finding the minimum and maximum, so a
+    gap inside a bucket that also holds numbers is not kept.
+
+    Parameters
+    ----------
+    x
+        The x values of the line, sorted in ascending order
+    y
+        The y values of the line
+    width
+        The number of buckets to use, usually the width of the axis in pixels
+    use_numba
+        Whether to use the numba-compiled kernel, if numba is installed
+
+    Returns
+    -------
+    The x and y values of the downsampled line
+    """
+    numba_kernels = _get_numba_kernels(use_numba)
+    if numba_kernels is not None:
+        return numba_kernels.m4_downsample(x, y, width)
+    return _m4_downsample_numpy(x, y, width)
+
+
+def hist_uniform_stacked(
+    x: np.ndarray,
+    lengths: np.ndarray,
+    bin_edges: np.ndarray,
+    use_numba: bool = False,
+) -> np.ndarray:
+    """
+    Counts the values of several datasets in equal-width bins. The datasets are
+    passed concatenated into a single array, which is read only once. The counts
+    are the same as np.histogram gives with the same bin edges, including the last
+    bin holding the upper edge.
+
+    Parameters
+    ----------
+    x
+        The concatenated values of all datasets, all within the bin edges
+    lengths
+        The number of values in each dataset
+    bin_edges
+        The equally spaced bin edges, as given by np.histogram_bin_edges
+    use_numba
+        Whether to use the numba-compiled kernel, if numba is installed
+
+    Returns
+    -------
+    An (n_datasets, n_bins) array with the number of values in each bin
+    """
+    numba_kernels = _get_numba_kernels(use_numba)
+    if numba_kernels is not None:
+        return numba_kernels.hist_uniform_stacked(x, lengths, bin_edges)
+    return _hist_uniform_stacked_numpy(x, lengths, bin_edges)
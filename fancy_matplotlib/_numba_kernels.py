@@ -0,0 +1,49 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def m4_downsample(x, y, width):
+    num_points = len(x)
+    edges = np.linspace(x[0], x[-1], width + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1]))
+    num_buckets = len(starts)
+    kept = np.empty((num_buckets, 4), dtype=np.int64)
+    for bucket in range(num_buckets):
+        start = starts[bucket]
+        end = starts[bucket + 1] if bucket + 1 < num_buckets else num_points
+        min_index = start
+        max_index = start
+        for i in range(start + 1, end):
+            if y[i] < y[min_index] or np.isnan(y[min_index]):
+                min_index = i
+            if y[i] > y[max_index] or np.isnan(y[max_index]):
+                max_index = i
+        kept[bucket, 0] = start
+        kept[bucket, 1] = min(min_index, max_index)
+        kept[bucket, 2] = max(min_index, max_index)
+        kept[bucket, 3] = end - 1
+    kept_indices = np.unique(kept.ravel())
+    return x[kept_indices], y[kept_indices]
+
+
+# Serial, since a parallel loop would race on the shared counts
+@njit(cache=True)
+def hist_uniform_stacked(x, lengths, bin_edges):
+    nbins = len(bin_edges) - 1
+    lo = bin_edges[0]
+    hi = bin_edges[-1]
+    counts = np.zeros((len(lengths), nbins), dtype=np.int64)
+    start = 0
+    for series in range(len(lengths)):
+        for i in range(start, start + lengths[series]):
+            bin_index = int((x[i] - lo) / (hi - lo) * nbins)
+            bin_index = min(max(bin_index, 0), nbins - 1)
+            # As in np.histogram, correct the index against the edges themselves
+            if x[i] < bin_edges[bin_index]:
+                bin_index -= 1
+            elif x[i] >= bin_edges[bin_index + 1] and bin_index != nbins - 1:
+                bin_index += 1
+            counts[series, bin_index] += 1
+        start += lengths[series]
+    return counts
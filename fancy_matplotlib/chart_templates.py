@@ -2,8 +2,16 @@ from typing import List, Optional, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
-from .plotting_template import BasePlot, tableau20, InvalidInputException
+from ._kernels import hist_uniform_stacked, m4_downsample
+from .plotting_template import (
+    BasePlot,
+    tableau20,
+    get_colors,
+    InvalidInputException,
+)
 
 DEFAULT_BAR_WIDTH = 0.8
 
@@ -40,14 +48,33 @@ class LineChart(BasePlot):
         self.grid_range = np.arange(self.min_x, self.max_x + self.diff_x_ticks)
 
     def plot(self):
-        for index, y_arr in enumerate(self.y_data):
-            plt.plot(
-                self.x_data,
-                y_arr,
-                lw=1,
-                color=tableau20[index],
-                label=self.y_descriptors[index] if self.y_descriptors else None,
-            )
+        colors = [tuple(color) for color in get_colors(len(self.y_data))]
+        x_arr = np.asarray(self.x_data)
+        width = int(self.ax.get_window_extent().width)
+        # Lines with many more points than pixels are drawn from their M4 summary,
+        # which gives the same image with far fewer vertices. Lines with NaN gaps
+        # are drawn in full, since the summary would join the line across the gaps
+        downsample = (
+            width > 0 and len(x_arr) > 4 * width and np.all(np.diff(x_arr) >= 0)
+        )
+        segments = []
+        for y_arr in self.y_data:
+            y_arr = np.asarray(y_arr)
+            if downsample and not np.isnan(y_arr).any():
+                segments.append(np.column_stack(
+                    m4_downsample(x_arr, y_arr, width, use_numba=self.use_numba)
+                ))
+            else:
+                segments.append(np.column_stack([x_arr, y_arr]))
+        self.ax.add_collection(LineCollection(segments, colors=colors, linewidths=1))
+        self.ax.autoscale_view()
+        if self.y_descriptors:
+            # The collection is a single artist, so each line gets a proxy artist for
+            # its entry in the legend
+            self.legend_handles = [
+                Line2D([], [], lw=1, color=color, label=descriptor)
+                for color, descriptor in zip(colors, self.y_descriptors)
+            ]
 
 
 class SingleBarChart(BasePlot):
@@ -89,19 +116,18 @@ class SingleBarChart(BasePlot):
             raise InvalidInputException('This function plots only one bar')
 
     def get_grid_range(self):
-        grid_range = (
-            list(np.arange(self.min_x, self.max_x + 1)) +
-            [self.min_x - 0.5 * DEFAULT_BAR_WIDTH] +
-            [self.max_x + 0.5 * DEFAULT_BAR_WIDTH]
-        )
-        self.grid_range = sorted(grid_range)
+        self.grid_range = np.concatenate((
+            [self.min_x - 0.5 * DEFAULT_BAR_WIDTH],
+            np.arange(self.min_x, self.max_x + 1),
+            [self.max_x + 0.5 * DEFAULT_BAR_WIDTH],
+        ))
 
     def plot(self):
         plt.bar(
             self.converted_x_data,
             self.y_data,
             lw=1,
-            color=tableau20[0],
+            color=tuple(tableau20[0]),
             label=self.y_descriptors[0] if self.y_descriptors else None
         )
 
@@ -135,31 +161,41 @@ class MultipleBarChart(BasePlot):
         )
         self.converted_x_data = np.arange(0, len(self.x_data))
         self.bar_width = 0.25 if len(y_data) < 5 else 0.1
+        self._n_series = None
+        self._half_span = None
+
+    def _update_span(self):
+        """
+        Updates the number of bars in each group and half the width of a group. These
+        are only recomputed when the number of bars in y_data has changed
+        """
+        n_series = len(self.y_data)
+        if n_series != self._n_series:
+            self._n_series = n_series
+            self._half_span = self.bar_width * n_series / 2
 
     def get_grid_range(self):
-        grid_range = (
-            list(np.arange(self.min_x, self.max_x + 1)) +
-            [self.min_x - self.bar_width * len(self.y_data) / 2] +
-            [self.max_x + self.bar_width * len(self.y_data) / 2]
-        )
-        self.grid_range = sorted(grid_range)
+        self._update_span()
+        self.grid_range = np.concatenate((
+            [self.min_x - self._half_span],
+            np.arange(self.min_x, self.max_x + 1),
+            [self.max_x + self._half_span],
+        ))
 
     def plot(self):
-        start_step = (
-            np.array(self.converted_x_data) -
-            self.bar_width * len(self.y_data) / 2
-            + 0.5 * self.bar_width
-        )
-        for index, y_arr in enumerate(self.y_data):
+        self._update_span()
+        offsets = np.arange(self._n_series) * self.bar_width - self._half_span
+        offsets += 0.5 * self.bar_width
+        positions = self.converted_x_data[np.newaxis, :] + offsets[:, np.newaxis]
+        for index, (bar_positions, y_arr) in enumerate(zip(positions, self.y_data)):
             plt.bar(
-                start_step,
+                bar_positions,
                 y_arr,
                 lw=1,
                 width=self.bar_width,
-                color=tableau20[index],
+                color=tuple(tableau20[index]),
                 label=self.y_descriptors[index] if self.y_descriptors else None
             )
-            start_step += self.bar_width
 
 
 class Histogram(BasePlot):
@@ -171,7 +207,8 @@ class Histogram(BasePlot):
     num_bins
         The number of bins to use in the histogram
     bins
-        The values of the bin edges in the histogram
+        The values of the bin edges in the histogram, shared by all datasets and
+        sorted in ascending order
     """
 
     def __init__(
@@ -196,17 +233,16 @@ class Histogram(BasePlot):
             title,
         )
         self.num_bins = num_bins
-        self.bins = []
-        hist_bin_values = []
-        for x_array in x_data:
-            current_hist_bin_values, bins = np.histogram(
-                x_array,
-                bins=self.num_bins,
-            )
-            self.bins += list(bins)
-            hist_bin_values += list(current_hist_bin_values)
+        flat_x_data = np.concatenate([np.asarray(x_arr).ravel() for x_arr in x_data])
+        self.bins = np.histogram_bin_edges(flat_x_data, bins=self.num_bins)
+        self._counts = hist_uniform_stacked(
+            flat_x_data,
+            np.array([np.size(x_arr) for x_arr in x_data]),
+            self.bins,
+            use_numba=self.use_numba,
+        )
         self.min_y = 0
-        self.max_y = max(hist_bin_values)
+        self.max_y = int(self._counts.max())
 
     def get_min_max(self):
         pass
@@ -218,26 +254,32 @@ class Histogram(BasePlot):
             self.diff_y_ticks,
         )
         x_tick_range = np.arange(
-            min(self.bins),
-            max(self.bins) + self.diff_x_ticks,
+            self.bins[0],
+            self.bins[-1] + self.diff_x_ticks,
             self.diff_x_ticks,
         )
         plt.yticks(y_tick_range, [str(x) + "%" for x in y_tick_range])
         plt.xticks(x_tick_range, [int(x) for x in x_tick_range])
 
     def get_grid_range(self):
-        self.grid_range = list(np.arange(
-            min(self.bins),
-            max(self.bins),
-            (max(self.bins) - min(self.bins))/len(self.bins)
-        ))
-        self.grid_range.append(max(self.bins))
+        self.grid_range = np.linspace(self.bins[0], self.bins[-1], len(self.bins))
 
     def plot(self):
-        plt.hist(
-            self.x_data,
-            bins=self.num_bins,
-            color=[tableau20[i] for i in range(len(self.x_data))],
-            edgecolor='black',
-            lw=0.5,
-        )
+        bin_widths = np.diff(self.bins)
+        num_datasets = len(self._counts)
+        # As with plt.hist, multiple datasets are drawn side by side within each bin
+        relative_width = 0.8 if num_datasets > 1 else 1.0
+        bar_widths = relative_width * bin_widths / num_datasets
+        left_edges = self.bins[:-1] + 0.5 * (1 - relative_width) * bin_widths
+        colors = get_colors(num_datasets)
+        for index, counts in enumerate(self._counts):
+            plt.bar(
+                left_edges + index * bar_widths,
+                counts,
+                width=bar_widths,
+                align='edge',
+                color=tuple(colors[index]),
+                edgecolor='black',
+                lw=0.5,
+                label=self.y_descriptors[index] if self.y_descriptors else None,
+            )
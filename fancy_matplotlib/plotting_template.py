@@ -3,17 +3,21 @@ from typing import List, Optional, Union
 import matplotlib.pyplot as plt
 import numpy as np
 
-tableau20 = [
+tableau20 = np.array([
     (31, 119, 180), (174, 199, 232), (255, 127, 14), (255, 187, 120),
     (44, 160, 44), (152, 223, 138), (214, 39, 40), (255, 152, 150),
     (148, 103, 189), (197, 176, 213), (140, 86, 75), (196, 156, 148),
     (227, 119, 194), (247, 182, 210), (127, 127, 127), (199, 199, 199),
     (188, 189, 34), (219, 219, 141), (23, 190, 207), (158, 218, 229)
-]
+], dtype=np.float64) / 255.
 
-for i in range(len(tableau20)):
-    r, g, b = tableau20[i]
-    tableau20[i] = (r / 255., g / 255., b / 255.)
+
+def get_colors(n: int) -> np.ndarray:
+    """
+    Gets the first n colours of the tableau20 palette as an (n, 3) array of RGB
+    values in the range [0, 1]
+    """
+    return tableau20[:n]
 
 
 class InvalidInputException(Exception):
@@ -25,6 +29,11 @@ class InvalidInputException(Exception):
 class BasePlot:
 
     """
+    Calling the chart generates it. The limits and grid range are reused when the
+    chart is generated again, unless the data has been replaced or the number of
+    values in it has changed. Editing values in place is not detected, so replace
+    the data after changing its values.
+
     Attributes
     ----------
     x_data
@@ -56,8 +65,22 @@ class BasePlot:
         An axis object
     grid_range
         The range of x-values used for plotting the grid
+    legend_handles
+        The artists to include in the legend. If not set, the legend is built from
+        the labelled artists on the axis
+    use_tex
+        Whether to render the text with LaTeX. This is off by default, since every
+        text element then requires a LaTeX run
+    use_numba
+        Whether to compile the line downsampling and histogram counting with numba,
+        if it is installed. This is off by default, since the first chart in each
+        process then pays several seconds of compilation whenever numba cannot
+        write its cache
     """
 
+    use_tex = False
+    use_numba = False
+
     def __init__(
         self,
         x_data: Union[List, np.ndarray],
@@ -109,14 +132,17 @@ class BasePlot:
         self.max_y = None
         self.ax = None
         self.grid_range = None
+        self.legend_handles = None
+        self._prep_cache = None
 
     def __call__(self):
         """
         Generates the chart
         """
-        self.set_up_chart()
-        self.plot()
-        self.include_text()
+        with plt.rc_context(self.get_font_params()):
+            self.set_up_chart()
+            self.plot()
+            self.include_text()
         plt.show()
 
     def set_up_chart(self):
@@ -125,12 +151,40 @@ class BasePlot:
         ticks and the grid
         """
         self.check_inputs()
-        self.set_font()
         self.ax = plt.subplot(111)
         self.remove_spines()
-        self.get_min_max()
+        # The limits and grid range only depend on the data and the tick gaps, so
+        # they are reused when the chart is redrawn without replacing the data.
+        # The data objects themselves are kept in the cache, so they cannot be
+        # freed and have their ids reused by new data. The lengths catch series
+        # being added or extended in place
+        prep_data = (self.x_data, self.converted_x_data, self.y_data)
+        prep_params = (
+            self.diff_x_ticks,
+            self.diff_y_ticks,
+            len(self.x_data),
+            None if self.y_data is None else tuple(np.size(y) for y in self.y_data),
+        )
+        if (
+            self._prep_cache is not None
+            and all(
+                cached is current
+                for cached, current in zip(self._prep_cache[0], prep_data)
+            )
+            and self._prep_cache[1] == prep_params
+        ):
+            self.min_x, self.max_x, self.min_y, self.max_y, self.grid_range = (
+                self._prep_cache[2]
+            )
+        else:
+            self.get_min_max()
+            self.get_grid_range()
+            self._prep_cache = (
+                prep_data,
+                prep_params,
+                (self.min_x, self.max_x, self.min_y, self.max_y, self.grid_range),
+            )
         self.get_ticks()
-        self.get_grid_range()
         self.get_grid()
 
     def check_inputs(self):
@@ -152,13 +206,12 @@ class BasePlot:
         """
         raise NotImplementedError
 
-    @staticmethod
-    def set_font():
+    def get_font_params(self) -> dict:
         """
-        Sets the font of the text by over-riding the default font used by Matplotlib
+        Gets the rcParams used to over-ride the default font used by Matplotlib. These
+        are only applied while the chart is being generated
         """
-        plt.rc('text', usetex=True)
-        plt.rc('font', family='serif')
+        return {'text.usetex': self.use_tex, 'font.family': 'serif'}
 
     def include_text(self):
         """
@@ -168,8 +221,13 @@ class BasePlot:
         plt.xlabel(self.x_axis_label) if self.x_axis_label else None
         plt.ylabel(self.y_axis_label) if self.y_axis_label else None
         if self.y_descriptors:
-            plt.legend(loc=7, frameon=False, bbox_to_anchor=(1.112, 0.5), fontsize=8)
-        plt.show()
+            plt.legend(
+                handles=self.legend_handles,
+                loc=7,
+                frameon=False,
+                bbox_to_anchor=(1.112, 0.5),
+                fontsize=8,
+            )
 
     def remove_spines(self):
         """
@@ -190,11 +248,17 @@ class BasePlot:
         if not self.y_data:
             return
         try:
-            self.min_y = min(min(y_arr) for y_arr in self.y_data)
-            self.max_y = max(max(y_arr) for y_arr in self.y_data)
-        except TypeError:
-            self.min_y = min(self.y_data)
-            self.max_y = max(self.y_data)
+            y_array = np.asarray(self.y_data)
+        except ValueError:
+            y_array = None
+        if y_array is not None and y_array.dtype != object:
+            self.min_y = y_array.min()
+            self.max_y = y_array.max()
+        else:
+            # Ragged input (series of different lengths): reduce each series
+            # separately and combine the per-series results
+            self.min_y = np.array([np.min(y_arr) for y_arr in self.y_data]).min()
+            self.max_y = np.array([np.max(y_arr) for y_arr in self.y_data]).max()
 
     def get_ticks(self):
         """
@@ -225,14 +289,14 @@ class BasePlot:
 
     def get_grid(self):
         """
-        Gets the grid for the chart
+        Gets the grid for the chart. All grid lines are drawn as a single collection
         """
-        for y in range(self.min_y, self.max_y + self.diff_y_ticks, self.diff_y_ticks):
-            plt.plot(
-                self.grid_range,
-                [y] * len(self.grid_range),
-                "--",
-                lw=0.5,
-                color="black",
-                alpha=0.3,
-            )
+        self.ax.hlines(
+            np.arange(self.min_y, self.max_y + self.diff_y_ticks, self.diff_y_ticks),
+            self.grid_range[0],
+            self.grid_range[-1],
+            linestyles="--",
+            lw=0.5,
+            color="black",
+            alpha=0.3,
+        )
@@ -1,3 +1,4 @@
+import matplotlib.pyplot as plt
 import numpy as np
 import pytest
 
@@ -8,6 +9,16 @@ from fancy_matplotlib.chart_templates import (
     MultipleBarChart,
     InvalidInputException,
 )
+from fancy_matplotlib import _kernels
+
+try:
+    from fancy_matplotlib import _numba_kernels
+except ImportError:
+    _numba_kernels = None
+
+requires_numba = pytest.mark.skipif(
+    _numba_kernels is None, reason='numba is not installed'
+)
 
 
 def test_generating_line_chart():
@@ -87,3 +98,202 @@ def test_generating_single_bar_chart_with_wrong_input():
             x_axis_label='Sample x-axis',
         )
         bar_chart()
+
+
+def test_min_max_with_series_of_different_lengths():
+    x_values = [0, 1, 2, 3, 4]
+    y_values = [[10, 30, 70, 100, 150], [20, 40, 80]]
+    line_chart = LineChart(x_values, y_values)
+    line_chart.get_min_max()
+    assert line_chart.min_y == 10
+    assert line_chart.max_y == 150
+
+
+def test_histogram_uses_shared_bins():
+    x_values = [np.arange(0, 100), np.arange(50, 150)]
+    histogram = Histogram(x_values, num_bins=10)
+    assert len(histogram.bins) == 11
+    assert histogram.bins[0] == 0
+    assert histogram.bins[-1] == 149
+    assert histogram._counts.shape == (2, 10)
+    assert histogram._counts.sum() == 200
+
+
+@pytest.mark.parametrize('x_values, num_bins', [
+    ([[1, 2, 3], [4, 5]], 2),
+    ([np.arange(0, 101)], 10),
+    ([np.arange(0, 256), np.arange(100, 1000)], 30),
+])
+def test_histogram_counts_match_numpy_on_integer_data(x_values, num_bins):
+    histogram = Histogram(x_values, num_bins=num_bins)
+    for x_arr, counts in zip(x_values, histogram._counts):
+        assert np.array_equal(counts, np.histogram(x_arr, bins=histogram.bins)[0])
+
+
+def test_line_chart_legend_has_an_entry_per_line():
+    x_values = [0, 1, 2, 3, 4]
+    y_values = [[10, 30, 70, 100, 150], [20, 40, 80, 120, 30]]
+    line_chart = LineChart(x_values, y_values, y_descriptors=['Line 1', 'Line 2'])
+    line_chart()
+    legend_texts = line_chart.ax.get_legend().get_texts()
+    assert [text.get_text() for text in legend_texts] == ['Line 1', 'Line 2']
+
+
+def test_redrawing_chart_after_replacing_data():
+    x_values = ['A', 'B', 'C', 'D', 'E']
+    bar_chart = SingleBarChart(x_values, [10, 30, 70, 100, 150])
+    bar_chart()
+    bar_chart()
+    assert bar_chart.max_y == 150
+    bar_chart.y_data = [20, 40, 80, 120, 30]
+    bar_chart()
+    assert bar_chart.max_y == 120
+
+
+def test_redrawing_chart_after_adding_a_series_in_place():
+    x_values = [0, 1, 2]
+    line_chart = LineChart(x_values, [[10, 30, 70], [20, 40, 80]])
+    line_chart()
+    line_chart.y_data.append([5, 5, 150])
+    line_chart()
+    assert line_chart.min_y == 5
+    assert line_chart.max_y == 150
+
+
+def test_redrawing_multiple_bar_chart_with_more_bars():
+    x_values = ['A', 'B', 'C']
+    multiple_bar_chart = MultipleBarChart(x_values, [[10, 30, 70], [20, 40, 80]])
+    multiple_bar_chart()
+    multiple_bar_chart.y_data = [[10, 30, 70], [20, 40, 80], [10, 20, 30]]
+    plt.close('all')
+    multiple_bar_chart()
+    assert len(multiple_bar_chart.ax.containers) == 3
+
+
+def test_plotting_multiple_bar_chart_after_adding_bars_in_place():
+    x_values = ['A', 'B', 'C']
+    multiple_bar_chart = MultipleBarChart(x_values, [[10, 30, 70], [20, 40, 80]])
+    multiple_bar_chart.ax = plt.subplot(111)
+    multiple_bar_chart.plot()
+    multiple_bar_chart.y_data.append([5, 5, 5])
+    plt.close('all')
+    multiple_bar_chart.ax = plt.subplot(111)
+    multiple_bar_chart.plot()
+    assert len(multiple_bar_chart.ax.containers) == 3
+
+
+@pytest.mark.parametrize('m4_downsample', [
+    _kernels._m4_downsample_numpy,
+    pytest.param(
+        getattr(_numba_kernels, 'm4_downsample', None), marks=requires_numba
+    ),
+])
+def test_m4_downsampling_keeps_extremes_and_endpoints(m4_downsample):
+    x_values = np.arange(100000)
+    y_values = np.sin(x_values / 1000) + np.random.random(100000)
+    x_down, y_down = m4_downsample(x_values, y_values, 500)
+    assert len(x_down) <= 4 * 500
+    assert np.all(np.diff(x_down) > 0)
+    assert (x_down[0], x_down[-1]) == (x_values[0], x_values[-1])
+    assert y_down.min() == y_values.min()
+    assert y_down.max() == y_values.max()
+    assert np.array_equal(y_values[x_down], y_down)
+
+
+@pytest.mark.parametrize('m4_downsample', [
+    _kernels._m4_downsample_numpy,
+    pytest.param(
+        getattr(_numba_kernels, 'm4_downsample', None), marks=requires_numba
+    ),
+])
+def test_m4_downsampling_with_nan_values(m4_downsample):
+    x_values = np.arange(100000)
+    y_values = np.random.random(100000)
+    y_values[1000:3000] = np.nan
+    y_values[50000] = np.nan
+    x_down, y_down = m4_downsample(x_values, y_values, 500)
+    assert len(x_down) <= 4 * 500
+    assert np.nanmin(y_down) == np.nanmin(y_values)
+    assert np.nanmax(y_down) == np.nanmax(y_values)
+    assert np.array_equal(y_values[x_down], y_down, equal_nan=True)
+
+
+def test_line_chart_draws_lines_with_nan_values_in_full():
+    x_values = np.arange(100000)
+    y_values = [np.random.random(100000), np.random.random(100000)]
+    y_values[0][1000:3000] = np.nan
+    line_chart = LineChart(x_values, y_values)
+    line_chart.ax = plt.subplot(111)
+    line_chart.plot()
+    paths = line_chart.ax.collections[-1].get_paths()
+    assert len(paths[0].vertices) == len(x_values)
+    assert len(paths[1].vertices) < len(x_values)
+
+
+def test_generating_line_chart_with_long_lines():
+    x_values = np.arange(100000)
+    y_values = [np.random.randint(0, 100, 100000), np.random.randint(0, 100, 100000)]
+    line_chart = LineChart(x_values, y_values, diff_x_ticks=10000)
+    line_chart()
+    segments = line_chart.ax.collections[-1].get_segments()
+    assert all(len(segment) < len(x_values) for segment in segments)
+
+
+@pytest.mark.parametrize('hist_uniform_stacked', [
+    _kernels._hist_uniform_stacked_numpy,
+    pytest.param(
+        getattr(_numba_kernels, 'hist_uniform_stacked', None), marks=requires_numba
+    ),
+])
+@pytest.mark.parametrize('x_values, num_bins', [
+    ([np.random.random(10000) * 1000, np.random.random(5000) * 1000], 30),
+    ([np.array([0, .3, .6, 1])], 10),
+    ([np.arange(0, 101), np.arange(0, 256)], 10),
+])
+def test_hist_uniform_stacked_matches_numpy_histogram(
+    hist_uniform_stacked, x_values, num_bins
+):
+    flat_x_values = np.concatenate(x_values)
+    bin_edges = np.histogram_bin_edges(flat_x_values, bins=num_bins)
+    lengths = np.array([len(x_arr) for x_arr in x_values])
+    counts = hist_uniform_stacked(flat_x_values, lengths, bin_edges)
+    assert counts.shape == (len(x_values), num_bins)
+    for x_arr, series_counts in zip(x_values, counts):
+        assert np.array_equal(series_counts, np.histogram(x_arr, bins=bin_edges)[0])
+
+
+def test_generating_chart_does_not_change_global_font_settings():
+    font_family = plt.rcParams['font.family']
+    x_values = ['A', 'B', 'C', 'D', 'E']
+    bar_chart = SingleBarChart(x_values, [10, 30, 70, 100, 150])
+    bar_chart()
+    assert plt.rcParams['font.family'] == font_family
+    assert not plt.rcParams['text.usetex']
+
+
+@requires_numba
+def test_generating_charts_with_numba(monkeypatch):
+    calls = []
+
+    def record_calls(kernel):
+        def wrapper(*args):
+            calls.append(kernel.__name__)
+            return kernel(*args)
+        return wrapper
+
+    for name in ('m4_downsample', 'hist_uniform_stacked'):
+        monkeypatch.setattr(
+            _numba_kernels, name, record_calls(getattr(_numba_kernels, name))
+        )
+    monkeypatch.setattr(LineChart, 'use_numba', True)
+    monkeypatch.setattr(Histogram, 'use_numba', True)
+
+    x_values = [np.arange(0, 101), np.arange(50, 151)]
+    histogram = Histogram(x_values, num_bins=10)
+    for x_arr, counts in zip(x_values, histogram._counts):
+        assert np.array_equal(counts, np.histogram(x_arr, bins=histogram.bins)[0])
+    line_chart = LineChart(
+        np.arange(100000), [np.random.randint(0, 100, 100000)], diff_x_ticks=10000
+    )
+    line_chart()
+    assert calls == ['hist_uniform_stacked', 'm4_downsample']